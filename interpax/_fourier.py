@@ -12,7 +12,8 @@ def fft_interp1d(f: jax.Array, n: int, sx: jax.Array = None, dx: float = 1.0):
     Parameters
     ----------
     f : ndarray, shape(nx, ...)
-        Source data. Assumed to cover 1 full period, excluding the endpoint.
+        Source data, must be real valued. Assumed to cover 1 full period, excluding
+        the endpoint.
     n : int
         Number of desired interpolation points.
     sx : ndarray or None
@@ -25,17 +26,14 @@ def fft_interp1d(f: jax.Array, n: int, sx: jax.Array = None, dx: float = 1.0):
     fi : ndarray, shape(n, ..., len(sx))
         Interpolated (and possibly shifted) data points
     """
-    c = jnp.fft.ifft(f, axis=0)
-    nx = c.shape[0]
+    c = jnp.fft.rfft(f, axis=0)
+    nx = f.shape[0]
     if sx is not None:
-        sx = jnp.exp(-1j * 2 * jnp.pi * jnp.fft.fftfreq(nx)[:, None] * sx / dx)
+        sx = jnp.exp(1j * 2 * jnp.pi * jnp.fft.rfftfreq(nx)[:, None] * sx / dx)
         c = (c[None].T * sx).T
         c = jnp.moveaxis(c, 0, -1)
-    pad = ((n - nx) // 2, n - nx - (n - nx) // 2)
-    if nx % 2 != 0:
-        pad = pad[::-1]
-    c = jnp.fft.ifftshift(_pad_along_axis(jnp.fft.fftshift(c, axes=0), pad, axis=0))
-    return jnp.fft.fft(c, axis=0).real
+    c = _resize_rfft(c, nx, n, axis=0)
+    return jnp.fft.irfft(c, n, axis=0) * (n / nx)
 
 
 @partial(jit, static_argnames=("n1", "n2"))
@@ -53,7 +51,8 @@ def fft_interp2d(
     Parameters
     ----------
     f : ndarray, shape(nx, ny, ...)
-        Source data. Assumed to cover 1 full period, excluding the endpoint.
+        Source data, must be real valued. Assumed to cover 1 full period, excluding
+        the endpoint.
     n1, n2 : int
         Number of desired interpolation points in x and y directions
     sx, sy : ndarray or None
@@ -67,28 +66,71 @@ def fft_interp2d(
     fi : ndarray, shape(n1, n2, ..., len(sx))
         Interpolated (and possibly shifted) data points
     """
-    c = jnp.fft.ifft2(f, axes=(0, 1))
-    nx, ny = c.shape[:2]
-    if (sx is not None) and (sy is not None):
-        sx = jnp.exp(-1j * 2 * jnp.pi * jnp.fft.fftfreq(nx)[:, None] * sx / dx)
-        sy = jnp.exp(-1j * 2 * jnp.pi * jnp.fft.fftfreq(ny)[:, None] * sy / dy)
-        c = (c[None].T * sx[None, :, :] * sy[:, None, :]).T
+    nx, ny = f.shape[:2]
+    shift = (sx is not None) and (sy is not None)
+    # real transform along x first, so the complex pass in y only sees ~nx/2 rows
+    c = jnp.fft.rfft(f, axis=0)
+    c = _resize_rfft(c, nx, n1, axis=0)
+    if shift:
+        kx = jnp.fft.rfftfreq(n1) * (n1 / nx)
+        sx = jnp.exp(1j * 2 * jnp.pi * kx[:, None] * sx / dx)
+        c = (c[None].T * sx).T
         c = jnp.moveaxis(c, 0, -1)
-    padx = ((n1 - nx) // 2, n1 - nx - (n1 - nx) // 2)
-    pady = ((n2 - ny) // 2, n2 - ny - (n2 - ny) // 2)
-    if nx % 2 != 0:
-        padx = padx[::-1]
-    if ny % 2 != 0:
-        pady = pady[::-1]
-
-    c = jnp.fft.ifftshift(
-        _pad_along_axis(jnp.fft.fftshift(c, axes=0), padx, axis=0), axes=0
-    )
-    c = jnp.fft.ifftshift(
-        _pad_along_axis(jnp.fft.fftshift(c, axes=1), pady, axis=1), axes=1
-    )
-
-    return jnp.fft.fft2(c, axes=(0, 1)).real
+    c = jnp.fft.fft(c, axis=1)
+    if shift and (n2 < ny):
+        c = _shift_fft(c, ny, ny, sy, dy, axis=1)
+    c = _resize_fft(c, ny, n2, axis=1)
+    if shift and (n2 >= ny):
+        c = _shift_fft(c, ny, n2, sy, dy, axis=1)
+    c = jnp.fft.ifft(c, axis=1)
+    return jnp.fft.irfft(c, n1, axis=0) * (n1 * n2 / (nx * ny))
+
+
+def _resize_rfft(c: jax.Array, nx: int, n: int, axis: int = 0):
+    """Pad or truncate one sided Fourier coefficients from nx to n points."""
+    c = jnp.moveaxis(c, axis, 0)
+    c = c[: min(nx, n) // 2 + 1]
+    if (n > nx) and (nx % 2 == 0):
+        # the old nyquist frequency is now a regular one, so irfft will double it
+        c = c.at[-1].multiply(0.5)
+    c = _pad_along_axis(c, (0, n // 2 + 1 - c.shape[0]), axis=0)
+    return jnp.moveaxis(c, 0, axis)
+
+
+def _resize_fft(c: jax.Array, nx: int, n: int, axis: int = 0):
+    """Pad or truncate two sided Fourier coefficients from nx to n points."""
+    c = jnp.moveaxis(c, axis, 0)
+    m = min(nx, n)
+    pos = c[: (m + 1) // 2]
+    neg = c[nx - m // 2 :]
+    if (m % 2 == 0) and (n > nx):
+        # split the old nyquist frequency evenly between +/- nx/2
+        neg = neg.at[0].multiply(0.5)
+        pos = jnp.concatenate([pos, neg[:1]])
+    elif (m % 2 == 0) and (n < nx):
+        # new nyquist frequency gets the average of the old +/- n/2 frequencies
+        neg = neg.at[0].set((neg[0] + c[m // 2]) / 2)
+    pos = _pad_along_axis(pos, (0, n - pos.shape[0] - neg.shape[0]), axis=0)
+    c = jnp.concatenate([pos, neg])
+    return jnp.moveaxis(c, 0, axis)
+
+
+def _shift_fft(
+    c: jax.Array, nx: int, n: int, s: jax.Array, dx: float = 1.0, axis: int = 0
+):
+    """Shift two sided Fourier coefficients of nx points, resized to n points.
+
+    The coefficients should already have a trailing axis for the shifts. Shifting
+    after padding lets a split nyquist frequency get the correct phase at +/- nx/2,
+    while shifting before truncating does the same for the ones merged at +/- n/2.
+    """
+    k = jnp.fft.fftfreq(n) * (n / nx)
+    s = jnp.exp(1j * 2 * jnp.pi * k[:, None] * s / dx)
+    if n % 2 == 0:
+        # nyquist frequency is both +/- n/2, so shift by the average phase
+        s = s.at[n // 2].set(s[n // 2].real)
+    c = jnp.moveaxis(c, axis, -2) * s
+    return jnp.moveaxis(c, -2, axis)
 
 
 def _pad_along_axis(array: jax.Array, pad: tuple = (0, 0), axis: int = 0):
@@ -1,6 +1,5 @@
 """Functions for interpolating splines that are JAX differentiable."""
 
-from collections import OrderedDict
 from functools import partial
 from typing import Union
 
@@ -18,6 +17,11 @@ METHODS_1D = CUBIC_METHODS + OTHER_METHODS + ("monotonic", "monotonic-0")
 METHODS_2D = CUBIC_METHODS + OTHER_METHODS
 METHODS_3D = CUBIC_METHODS + OTHER_METHODS
 
+# method="scan_unrolled" was added to jnp.searchsorted in jax 0.4.16, older versions
+# fall back to their default search
+_JAX_VERSION = tuple(int(v) for v in jax.__version__.split(".")[:3] if v.isdigit())
+_SEARCHSORTED_KWARGS = {"method": "scan_unrolled"} if _JAX_VERSION >= (0, 4, 16) else {}
+
 
 class Interpolator1D(eqx.Module):
     """Convenience class for representing a 1D interpolated function.
@@ -51,6 +55,15 @@ class Interpolator1D(eqx.Module):
     period : float > 0, None
         periodicity of the function. If given, function is assumed to be periodic
         on the interval [0,period]. None denotes no periodicity
+    uniform : bool, "auto"
+        whether the knots are evenly spaced, in which case query points are located
+        directly rather than by a binary search. ``'auto'`` checks the knots when
+        the interpolator is created, and assumes non-uniform if they are traced.
+    dtype : dtype, optional
+        data type to store the function values and derivatives in, eg ``jnp.float32``
+        to halve their memory. The derivatives are estimated before casting. The
+        knots keep their own type, so values are promoted back to it when evaluated.
+        None keeps the type of ``f``.
 
     Notes
     -----
@@ -65,6 +78,7 @@ class Interpolator1D(eqx.Module):
     method: str
     extrap: Union[bool, float, tuple]
     period: Union[None, float]
+    uniform: bool
     axis: int
 
     def __init__(
@@ -74,6 +88,8 @@ class Interpolator1D(eqx.Module):
         method: str = "cubic",
         extrap: Union[bool, float, tuple] = False,
         period: Union[None, float] = None,
+        uniform: Union[bool, str] = "auto",
+        dtype=None,
         **kwargs,
     ):
         x, f = map(jnp.asarray, (x, f))
@@ -88,16 +104,24 @@ class Interpolator1D(eqx.Module):
         errorif(method not in METHODS_1D, ValueError, f"unknown method {method}")
 
         self.x = x
-        self.f = f
+        self.f = f if dtype is None else f.astype(dtype)
         self.axis = axis
         self.method = method
         self.extrap = extrap
         self.period = period
+        self.uniform = _resolve_uniform(uniform, (x, period))[0]
+
+        if method in OTHER_METHODS:
+            # nearest and linear interpolation don't use derivatives
+            self.derivs = {}
+            return
 
         if fx is None:
             fx = approx_df(x, f, method, axis, **kwargs)
 
         self.derivs = {"fx": fx}
+        if dtype is not None:
+            self.derivs = {k: jnp.asarray(v, dtype) for k, v in self.derivs.items()}
 
     def __call__(self, xq: jax.Array, dx: int = 0):
         """Evaluate the interpolated function or its derivatives.
@@ -122,6 +146,7 @@ class Interpolator1D(eqx.Module):
             dx,
             self.extrap,
             self.period,
+            self.uniform,
             **self.derivs,
         )
 
@@ -157,6 +182,16 @@ class Interpolator2D(eqx.Module):
         periodicity of the function in x, y directions. None denotes no periodicity,
         otherwise function is assumed to be periodic on the interval [0,period]. Use a
         single value for the same in both directions.
+    uniform : bool, "auto", array-like, shape(2,)
+        whether the knots are evenly spaced in x, y directions, in which case query
+        points are located directly rather than by a binary search. ``'auto'``
+        checks the knots when the interpolator is created, and assumes non-uniform
+        if they are traced. Use a single value for the same in both directions.
+    dtype : dtype, optional
+        data type to store the function values and derivatives in, eg ``jnp.float32``
+        to halve their memory. The derivatives are estimated before casting. The
+        knots keep their own type, so values are promoted back to it when evaluated.
+        None keeps the type of ``f``.
 
     Notes
     -----
@@ -172,6 +207,7 @@ class Interpolator2D(eqx.Module):
     method: str
     extrap: Union[bool, float, tuple]
     period: Union[None, float, tuple]
+    uniform: tuple
     axis: int
 
     def __init__(
@@ -182,6 +218,8 @@ class Interpolator2D(eqx.Module):
         method: str = "cubic",
         extrap: Union[bool, float, tuple] = False,
         period: Union[None, float, tuple] = None,
+        uniform: Union[bool, str, tuple] = "auto",
+        dtype=None,
         **kwargs,
     ):
         x, y, f = map(jnp.asarray, (x, y, f))
@@ -204,11 +242,17 @@ class Interpolator2D(eqx.Module):
 
         self.x = x
         self.y = y
-        self.f = f
+        self.f = f if dtype is None else f.astype(dtype)
         self.axis = axis
         self.method = method
         self.extrap = extrap
         self.period = period
+        self.uniform = _resolve_uniform(uniform, *zip((x, y), _parse_ndarg(period, 2)))
+
+        if method in OTHER_METHODS:
+            # nearest and linear interpolation don't use derivatives
+            self.derivs = {}
+            return
 
         if fx is None:
             fx = approx_df(x, f, method, 0, **kwargs)
@@ -218,6 +262,8 @@ class Interpolator2D(eqx.Module):
             fxy = approx_df(y, fx, method, 1, **kwargs)
 
         self.derivs = {"fx": fx, "fy": fy, "fxy": fxy}
+        if dtype is not None:
+            self.derivs = {k: jnp.asarray(v, dtype) for k, v in self.derivs.items()}
 
     def __call__(self, xq: jax.Array, yq: jax.Array, dx: int = 0, dy: int = 0):
         """Evaluate the interpolated function or its derivatives.
@@ -244,6 +290,7 @@ class Interpolator2D(eqx.Module):
             (dx, dy),
             self.extrap,
             self.period,
+            self.uniform,
             **self.derivs,
         )
 
@@ -281,6 +328,16 @@ class Interpolator3D(eqx.Module):
         periodicity of the function in x, y, z directions. None denotes no periodicity,
         otherwise function is assumed to be periodic on the interval [0,period]. Use a
         single value for the same in both directions.
+    uniform : bool, "auto", array-like, shape(3,)
+        whether the knots are evenly spaced in x, y, z directions, in which case query
+        points are located directly rather than by a binary search. ``'auto'``
+        checks the knots when the interpolator is created, and assumes non-uniform
+        if they are traced. Use a single value for the same in all directions.
+    dtype : dtype, optional
+        data type to store the function values and derivatives in, eg ``jnp.float32``
+        to halve their memory. The derivatives are estimated before casting. The
+        knots keep their own type, so values are promoted back to it when evaluated.
+        None keeps the type of ``f``.
 
     Notes
     -----
@@ -297,6 +354,7 @@ class Interpolator3D(eqx.Module):
     method: str
     extrap: Union[bool, float, tuple]
     period: Union[None, float, tuple]
+    uniform: tuple
     axis: int
 
     def __init__(
@@ -308,6 +366,8 @@ class Interpolator3D(eqx.Module):
         method: str = "cubic",
         extrap: Union[bool, float, tuple] = False,
         period: Union[None, float, tuple] = None,
+        uniform: Union[bool, str, tuple] = "auto",
+        dtype=None,
         **kwargs,
     ):
         x, y, z, f = map(jnp.asarray, (x, y, z, f))
@@ -341,11 +401,19 @@ class Interpolator3D(eqx.Module):
         self.x = x
         self.y = y
         self.z = z
-        self.f = f
+        self.f = f if dtype is None else f.astype(dtype)
         self.axis = axis
         self.method = method
         self.extrap = extrap
         self.period = period
+        self.uniform = _resolve_uniform(
+            uniform, *zip((x, y, z), _parse_ndarg(period, 3))
+        )
+
+        if method in OTHER_METHODS:
+            # nearest and linear interpolation don't use derivatives
+            self.derivs = {}
+            return
 
         if fx is None:
             fx = approx_df(x, f, method, 0, **kwargs)
@@ -371,6 +439,8 @@ class Interpolator3D(eqx.Module):
             "fyz": fyz,
             "fxyz": fxyz,
         }
+        if dtype is not None:
+            self.derivs = {k: jnp.asarray(v, dtype) for k, v in self.derivs.items()}
 
     def __call__(
         self,
@@ -407,11 +477,12 @@ class Interpolator3D(eqx.Module):
             (dx, dy, dz),
             self.extrap,
             self.period,
+            self.uniform,
             **self.derivs,
         )
 
 
-@partial(jit, static_argnames="method")
+@partial(jit, static_argnames=("method", "uniform"))
 def interp1d(
     xq: jax.Array,
     x: jax.Array,
@@ -420,6 +491,7 @@ def interp1d(
     derivative: int = 0,
     extrap: Union[bool, float, tuple] = False,
     period: Union[None, float] = None,
+    uniform: bool = False,
     **kwargs,
 ):
     """Interpolate a 1d function.
@@ -457,6 +529,11 @@ def interp1d(
     period : float > 0, None
         periodicity of the function. If given, function is assumed to be periodic
         on the interval [0,period]. None denotes no periodicity
+    uniform : bool
+        whether the knots are evenly spaced. If True, the interval containing each
+        query point is computed directly rather than by a binary search. Gives
+        incorrect results if x is not actually uniform. For periodic functions this
+        applies to the knots after wrapping, so x should exclude the endpoint.
 
     Returns
     -------
@@ -495,18 +572,24 @@ def interp1d(
     if method == "nearest":
 
         def derivative0():
-            i = jnp.argmin(jnp.abs(xq[:, np.newaxis] - x[np.newaxis]), axis=1)
+            if uniform:
+                # round half down, to match argmin picking the first of a tie
+                dx = (x[-1] - x[0]) / (x.size - 1)
+                i = jnp.ceil((xq - x[0]) / dx - 0.5)
+                i = jnp.clip(i, 0, x.size - 1).astype(int)
+            else:
+                i = jnp.argmin(jnp.abs(xq[:, np.newaxis] - x[np.newaxis]), axis=1)
             return f[i]
 
         def derivative1():
-            return jnp.zeros((xq.size, *f.shape[1:]))
+            return jnp.zeros((xq.size, *f.shape[1:]), dtype=f.dtype)
 
         fq = jax.lax.switch(derivative, [derivative0, derivative1])
 
     elif method == "linear":
 
         def derivative0():
-            i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
+            i = _get_index(xq, x, uniform)
             df = jnp.take(f, i, axis) - jnp.take(f, i - 1, axis)
             dx = x[i] - x[i - 1]
             dxi = jnp.where(dx == 0, 0, 1 / dx)
@@ -519,20 +602,20 @@ def interp1d(
             return fq
 
         def derivative1():
-            i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
+            i = _get_index(xq, x, uniform)
             df = jnp.take(f, i, axis) - jnp.take(f, i - 1, axis)
             dx = x[i] - x[i - 1]
             dxi = jnp.where(dx == 0, 0, 1 / dx)
             return df * dxi
 
         def derivative2():
-            return jnp.zeros((xq.size, *f.shape[1:]))
+            return jnp.zeros((xq.size, *f.shape[1:]), dtype=jnp.result_type(xq, x, f))
 
         fq = jax.lax.switch(derivative, [derivative0, derivative1, derivative2])
 
     elif method in (CUBIC_METHODS + ("monotonic", "monotonic-0")):
 
-        i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
+        i = _get_index(xq, x, uniform)
         if fx is None:
             fx = approx_df(x, f, method, axis, **kwargs)
         assert fx.shape == f.shape
@@ -542,21 +625,29 @@ def interp1d(
         dxi = jnp.where(dx == 0, 0, 1 / dx)
         t = delta * dxi
 
-        f0 = jnp.take(f, i - 1, axis)
-        f1 = jnp.take(f, i, axis)
-        fx0 = jnp.take(fx, i - 1, axis) * dx
-        fx1 = jnp.take(fx, i, axis) * dx
-
-        F = jnp.vstack([f0, f1, fx0, fx1])
-        coef = jnp.matmul(A_CUBIC, F)
-        ttx = _get_t_der(t, derivative, dxi)
-        fq = jnp.einsum("ji...,ij->i...", coef, ttx)
+        if xq.size > x.size:
+            # with more query points than knots, it's cheaper to find the
+            # polynomial coefficients of every interval once and gather those
+            coef = jnp.take(_get_cubic_coef(x, f, fx, axis), i - 1, axis + 1)
+            ttx = _get_t_der(t, derivative, dxi)
+            fq = jnp.einsum("qi,iq...->q...", ttx, coef)
+        else:
+            F = jnp.array(
+                [
+                    jnp.take(f, i - 1, axis),
+                    jnp.take(f, i, axis),
+                    jnp.take(fx, i - 1, axis),
+                    jnp.take(fx, i, axis),
+                ]
+            )
+            hx = _get_hermite_basis(t, derivative, dx, dxi)
+            fq = jnp.einsum("qi,iq...->q...", hx, F)
 
     fq = _extrap(xq, fq, x, lowx, highx)
     return fq.reshape(outshape)
 
 
-@partial(jit, static_argnames="method")
+@partial(jit, static_argnames=("method", "uniform"))
 def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
     xq: jax.Array,
     yq: jax.Array,
@@ -567,6 +658,7 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
     derivative: int = 0,
     extrap: Union[bool, float, tuple] = False,
     period: Union[None, float, tuple] = None,
+    uniform: Union[bool, tuple] = False,
     **kwargs,
 ):
     """Interpolate a 2d function.
@@ -606,6 +698,12 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
         periodicity of the function in x, y directions. None denotes no periodicity,
         otherwise function is assumed to be periodic on the interval [0,period]. Use a
         single value for the same in both directions.
+    uniform : bool, tuple of bool, shape(2,)
+        whether the knots are evenly spaced in x, y directions. If True, the interval
+        containing each query point is computed directly rather than by a binary
+        search. Gives incorrect results if the knots are not actually uniform. For
+        periodic functions this applies to the knots after wrapping, so they should
+        exclude the endpoint. Use a single value for the same in both directions.
 
     Returns
     -------
@@ -644,6 +742,7 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
     errorif(method not in METHODS_2D, ValueError, f"unknown method {method}")
 
     periodx, periody = _parse_ndarg(period, 2)
+    uniformx, uniformy = _parse_ndarg(uniform, 2)
     derivative_x, derivative_y = _parse_ndarg(derivative, 2)
     lowx, highx, lowy, highy = _parse_extrap(extrap, 2)
 
@@ -660,8 +759,8 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
             # because of the regular spaced grid we know that the nearest point
             # will be one of the 4 neighbors on the grid, so we first find those
             # and then take the nearest one among them.
-            i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
-            j = jnp.clip(jnp.searchsorted(y, yq, side="right"), 1, len(y) - 1)
+            i = _get_index(xq, x, uniformx)
+            j = _get_index(yq, y, uniformy)
             neighbors_x = jnp.array(
                 [[x[i], x[i - 1], x[i], x[i - 1]], [y[j], y[j], y[j - 1], y[j - 1]]]
             )
@@ -674,7 +773,7 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
             return jax.vmap(jnp.take)(neighbors_f.T, idx)
 
         def derivative1():
-            return jnp.zeros((xq.size, *f.shape[2:]))
+            return jnp.zeros((xq.size, *f.shape[2:]), dtype=f.dtype)
 
         fq = jax.lax.cond(
             (derivative_x == 0) & (derivative_y == 0), derivative0, derivative1
@@ -682,8 +781,8 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
 
     elif method == "linear":
 
-        i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
-        j = jnp.clip(jnp.searchsorted(y, yq, side="right"), 1, len(y) - 1)
+        i = _get_index(xq, x, uniformx)
+        j = _get_index(yq, y, uniformy)
 
         f00 = f[i - 1, j - 1]
         f01 = f[i - 1, j]
@@ -719,8 +818,8 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
             fxy = approx_df(y, fx, method, 1, **kwargs)
         assert fx.shape == fy.shape == fxy.shape == f.shape
 
-        i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
-        j = jnp.clip(jnp.searchsorted(y, yq, side="right"), 1, len(y) - 1)
+        i = _get_index(xq, x, uniformx)
+        j = _get_index(yq, y, uniformy)
 
         dx = x[i] - x[i - 1]
         deltax = xq - x[i - 1]
@@ -731,27 +830,18 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
         dyi = jnp.where(dy == 0, 0, 1 / dy)
         ty = deltay * dyi
 
-        fs = OrderedDict()
-        fs["f"] = f
-        fs["fx"] = fx
-        fs["fy"] = fy
-        fs["fxy"] = fxy
-        fsq = OrderedDict()
-        for ff in fs.keys():
-            for jj in [0, 1]:
-                for ii in [0, 1]:
-                    fsq[ff + str(ii) + str(jj)] = fs[ff][i - 1 + ii, j - 1 + jj]
-                    if "x" in ff:
-                        fsq[ff + str(ii) + str(jj)] *= dx
-                    if "y" in ff:
-                        fsq[ff + str(ii) + str(jj)] *= dy
-
-        F = jnp.vstack([foo for foo in fsq.values()])
-        coef = jnp.matmul(A_BICUBIC, F)
-        coef = jnp.moveaxis(coef.reshape((4, 4, -1), order="F"), -1, 0)
-        ttx = _get_t_der(tx, derivative_x, dxi)
-        tty = _get_t_der(ty, derivative_y, dyi)
-        fq = jnp.einsum("ijk...,ij,ik->i...", coef, ttx, tty)
+        # Hermite data of each cell, indexed in each direction by the basis
+        # function index, ie [f(0), f(1), df(0), df(1)]
+        fs = [[f, fy], [fx, fxy]]
+        F = jnp.array(
+            [
+                [fs[a // 2][b // 2][i - 1 + a % 2, j - 1 + b % 2] for b in range(4)]
+                for a in range(4)
+            ]
+        )
+        hx = _get_hermite_basis(tx, derivative_x, dx, dxi)
+        hy = _get_hermite_basis(ty, derivative_y, dy, dyi)
+        fq = jnp.einsum("qi,qj,ijq...->q...", hx, hy, F)
 
     fq = _extrap(xq, fq, x, lowx, highx)
     fq = _extrap(yq, fq, y, lowy, highy)
@@ -759,7 +849,7 @@ def interp2d(  # noqa: C901 - FIXME: break this up into simpler pieces
     return fq.reshape(outshape)
 
 
-@partial(jit, static_argnames="method")
+@partial(jit, static_argnames=("method", "uniform"))
 def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
     xq: jax.Array,
     yq: jax.Array,
@@ -772,6 +862,7 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
     derivative: int = 0,
     extrap: Union[bool, float, tuple] = False,
     period: Union[None, float, tuple] = None,
+    uniform: Union[bool, tuple] = False,
     **kwargs,
 ):
     """Interpolate a 3d function.
@@ -815,6 +906,13 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
         periodicity of the function in x, y, z directions. None denotes no periodicity,
         otherwise function is assumed to be periodic on the interval [0,period]. Use a
         single value for the same in all directions.
+    uniform : bool, tuple of bool, shape(3,)
+        whether the knots are evenly spaced in x, y, z directions. If True, the
+        interval containing each query point is computed directly rather than by a
+        binary search. Gives incorrect results if the knots are not actually uniform.
+        For periodic functions this applies to the knots after wrapping, so they
+        should exclude the endpoint. Use a single value for the same in all
+        directions.
 
     Returns
     -------
@@ -863,6 +961,7 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
     fxyz = kwargs.pop("fxyz", None)
 
     periodx, periody, periodz = _parse_ndarg(period, 3)
+    uniformx, uniformy, uniformz = _parse_ndarg(uniform, 3)
     derivative_x, derivative_y, derivative_z = _parse_ndarg(derivative, 3)
     lowx, highx, lowy, highy, lowz, highz = _parse_extrap(extrap, 3)
 
@@ -888,9 +987,9 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
             # because of the regular spaced grid we know that the nearest point
             # will be one of the 8 neighbors on the grid, so we first find those
             # and then take the nearest one among them.
-            i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
-            j = jnp.clip(jnp.searchsorted(y, yq, side="right"), 1, len(y) - 1)
-            k = jnp.clip(jnp.searchsorted(z, zq, side="right"), 1, len(z) - 1)
+            i = _get_index(xq, x, uniformx)
+            j = _get_index(yq, y, uniformy)
+            k = _get_index(zq, z, uniformz)
             neighbors_x = jnp.array(
                 [
                     [x[i], x[i - 1], x[i], x[i - 1], x[i], x[i - 1], x[i], x[i - 1]],
@@ -916,7 +1015,7 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
             return jax.vmap(jnp.take)(neighbors_f.T, idx)
 
         def derivative1():
-            return jnp.zeros((xq.size, *f.shape[3:]))
+            return jnp.zeros((xq.size, *f.shape[3:]), dtype=f.dtype)
 
         fq = jax.lax.cond(
             (derivative_x == 0) & (derivative_y == 0) & (derivative_z == 0),
@@ -926,9 +1025,9 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
 
     elif method == "linear":
 
-        i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
-        j = jnp.clip(jnp.searchsorted(y, yq, side="right"), 1, len(y) - 1)
-        k = jnp.clip(jnp.searchsorted(z, zq, side="right"), 1, len(z) - 1)
+        i = _get_index(xq, x, uniformx)
+        j = _get_index(yq, y, uniformy)
+        k = _get_index(zq, z, uniformz)
 
         f000 = f[i - 1, j - 1, k - 1]
         f001 = f[i - 1, j - 1, k]
@@ -993,9 +1092,9 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
             == fxyz.shape
             == f.shape
         )
-        i = jnp.clip(jnp.searchsorted(x, xq, side="right"), 1, len(x) - 1)
-        j = jnp.clip(jnp.searchsorted(y, yq, side="right"), 1, len(y) - 1)
-        k = jnp.clip(jnp.searchsorted(z, zq, side="right"), 1, len(z) - 1)
+        i = _get_index(xq, x, uniformx)
+        j = _get_index(yq, y, uniformy)
+        k = _get_index(zq, z, uniformz)
 
         dx = x[i] - x[i - 1]
         deltax = xq - x[i - 1]
@@ -1012,37 +1111,27 @@ def interp3d(  # noqa: C901 - FIXME: break this up into simpler pieces
         dzi = jnp.where(dz == 0, 0, 1 / dz)
         tz = deltaz * dzi
 
-        fs = OrderedDict()
-        fs["f"] = f
-        fs["fx"] = fx
-        fs["fy"] = fy
-        fs["fz"] = fz
-        fs["fxy"] = fxy
-        fs["fxz"] = fxz
-        fs["fyz"] = fyz
-        fs["fxyz"] = fxyz
-        fsq = OrderedDict()
-        for ff in fs.keys():
-            for kk in [0, 1]:
-                for jj in [0, 1]:
-                    for ii in [0, 1]:
-                        fsq[ff + str(ii) + str(jj) + str(kk)] = fs[ff][
-                            i - 1 + ii, j - 1 + jj, k - 1 + kk
+        # Hermite data of each cell, indexed in each direction by the basis
+        # function index, ie [f(0), f(1), df(0), df(1)]
+        fs = [[[f, fz], [fy, fyz]], [[fx, fxz], [fxy, fxyz]]]
+        F = jnp.array(
+            [
+                [
+                    [
+                        fs[a // 2][b // 2][c // 2][
+                            i - 1 + a % 2, j - 1 + b % 2, k - 1 + c % 2
                         ]
-                        if "x" in ff:
-                            fsq[ff + str(ii) + str(jj) + str(kk)] *= dx
-                        if "y" in ff:
-                            fsq[ff + str(ii) + str(jj) + str(kk)] *= dy
-                        if "z" in ff:
-                            fsq[ff + str(ii) + str(jj) + str(kk)] *= dz
-
-        F = jnp.vstack([foo for foo in fsq.values()])
-        coef = jnp.matmul(A_TRICUBIC, F)
-        coef = jnp.moveaxis(coef.reshape((4, 4, 4, -1), order="F"), -1, 0)
-        ttx = _get_t_der(tx, derivative_x, dxi)
-        tty = _get_t_der(ty, derivative_y, dyi)
-        ttz = _get_t_der(tz, derivative_z, dzi)
-        fq = jnp.einsum("lijk...,li,lj,lk->l...", coef, ttx, tty, ttz)
+                        for c in range(4)
+                    ]
+                    for b in range(4)
+                ]
+                for a in range(4)
+            ]
+        )
+        hx = _get_hermite_basis(tx, derivative_x, dx, dxi)
+        hy = _get_hermite_basis(ty, derivative_y, dy, dyi)
+        hz = _get_hermite_basis(tz, derivative_z, dz, dzi)
+        fq = jnp.einsum("qi,qj,qk,ijkq...->q...", hx, hy, hz, F)
 
     fq = _extrap(xq, fq, x, lowx, highx)
     fq = _extrap(yq, fq, y, lowy, highy)
@@ -1091,6 +1180,72 @@ def _get_t_der(t: jax.Array, derivative: int, dxi: jax.Array):
     return jax.lax.switch(derivative, [d0, d1, d2, d3, d4])
 
 
+def _get_index(xq: jax.Array, x: jax.Array, uniform: bool):
+    """Find i such that x[i-1] <= xq < x[i], clipped to [1, len(x)-1]."""
+    if uniform:
+        dx = (x[-1] - x[0]) / (x.size - 1)
+        i = jnp.floor((xq - x[0]) / dx) + 1
+        return jnp.clip(i, 1, x.size - 1).astype(int)
+    # shapes are static under jit, so the binary search has a fixed number of steps
+    # that can be unrolled into straight line code
+    i = jnp.searchsorted(x, xq, side="right", **_SEARCHSORTED_KWARGS)
+    return jnp.clip(i, 1, x.size - 1)
+
+
+def _is_uniform(x: jax.Array, period: Union[None, float] = None):
+    """Check whether knots are evenly spaced, if they are known at trace time."""
+    if isinstance(x, jax.core.Tracer) or x.size < 2:
+        return False
+    if period is not None:
+        x = _make_periodic(x, x, period, 0)[1]
+    x = np.asarray(x)
+    dx = (x[-1] - x[0]) / (x.size - 1)
+    tol = np.sqrt(np.finfo(np.result_type(x.dtype, float)).eps) * abs(dx)
+    return bool(dx > 0) and np.allclose(x, x[0] + np.arange(x.size) * dx, 0, tol)
+
+
+def _resolve_uniform(uniform, *knots):
+    """Replace "auto" entries of uniform by checking the (x, period) knots."""
+    if isinstance(uniform, str):
+        uniform = tuple(uniform for _ in knots)
+    uniform = _parse_ndarg(uniform, len(knots))
+    errorif(
+        any(isinstance(u, str) and u != "auto" for u in uniform),
+        ValueError,
+        f"uniform should be a bool or 'auto', got {uniform}",
+    )
+    return tuple(
+        _is_uniform(x, period) if isinstance(u, str) else bool(u)
+        for u, (x, period) in zip(uniform, knots)
+    )
+
+
+@jit
+def _get_hermite_basis(t: jax.Array, derivative: int, dx: jax.Array, dxi: jax.Array):
+    """Get cubic Hermite basis functions for the data [f(0), f(1), df(0), df(1)]."""
+    h = jnp.matmul(_get_t_der(t, derivative, dxi), A_CUBIC)
+    return h * jnp.array([jnp.ones_like(dx), jnp.ones_like(dx), dx, dx]).T
+
+
+@partial(jit, static_argnames="axis")
+def _get_cubic_coef(x: jax.Array, f: jax.Array, fx: jax.Array, axis: int):
+    """Get coefficients of [1,t,t^2,t^3] on each interval, shape(4, Nx-1, ...)."""
+    dx = jnp.diff(x)
+    if f.ndim > dx.ndim:
+        dx = jnp.expand_dims(dx, tuple(range(1, f.ndim)))
+        dx = jnp.moveaxis(dx, 0, axis)
+    lo = jnp.arange(x.size - 1)
+    F = jnp.array(
+        [
+            jnp.take(f, lo, axis),
+            jnp.take(f, lo + 1, axis),
+            jnp.take(fx, lo, axis) * dx,
+            jnp.take(fx, lo + 1, axis) * dx,
+        ]
+    )
+    return jnp.tensordot(A_CUBIC, F, 1)
+
+
 def _parse_ndarg(arg, n):
     try:
         k = len(arg)
@@ -1224,22 +1379,13 @@ def approx_df(
         dxi = jnp.where(dx == 0, 0, 1 / dx)
         df = dxi * df
 
-        A = jnp.diag(
-            jnp.concatenate(
-                (
-                    np.array([1.0]),
-                    2 * (dx.flatten()[:-1] + dx.flatten()[1:]),
-                    np.array([1.0]),
-                )
-            )
-        )
-        upper_diag1 = jnp.diag(
-            jnp.concatenate((np.array([1.0]), dx.flatten()[:-1])), k=1
-        )
-        lower_diag1 = jnp.diag(
-            jnp.concatenate((dx.flatten()[1:], np.array([1.0]))), k=-1
-        )
-        A += upper_diag1 + lower_diag1
+        h = dx.flatten()
+        one = jnp.ones_like(h[:1])
+        zero = jnp.zeros_like(h[:1])
+        # lower, main and upper diagonals of the (tridiagonal) system matrix
+        dl = jnp.concatenate([zero, h[1:], one])
+        d = jnp.concatenate([one, 2 * (h[:-1] + h[1:]), one])
+        du = jnp.concatenate([one, h[:-1], zero])
         b = jnp.concatenate(
             [
                 2 * jnp.take(df, jnp.array([0]), axis, mode="wrap"),
@@ -1254,9 +1400,7 @@ def approx_df(
             ],
             axis=axis,
         )
-        ba = jnp.moveaxis(b, axis, 0)
-        br = ba.reshape((b.shape[axis], -1))
-        fx = jnp.linalg.solve(A, br).reshape(ba.shape)
+        fx = _tridiagonal_solve(dl, d, du, jnp.moveaxis(b, axis, 0))
         fx = jnp.moveaxis(fx, 0, axis)
         return fx
 
@@ -1352,157 +1496,49 @@ def approx_df(
         return jnp.zeros_like(f)
 
 
-# fmt: off
-A_TRICUBIC = np.array([
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [-3, 3, 0, 0, 0, 0, 0, 0,-2,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 2,-2, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-      0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -2,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [-3, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0,-3, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -2, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 9,-9,-9, 9, 0, 0, 0, 0, 6, 3,-6,-3, 0, 0, 0, 0, 6,-6, 3,-3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     4, 2, 2, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [-6, 6, 6,-6, 0, 0, 0, 0,-3,-3, 3, 3, 0, 0, 0, 0,-4, 4,-2, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -2,-2,-1,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 2, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 2, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [-6, 6, 6,-6, 0, 0, 0, 0,-4,-2, 4, 2, 0, 0, 0, 0,-3, 3,-3, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -2,-1,-2,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 4,-4,-4, 4, 0, 0, 0, 0, 2, 2,-2,-2, 0, 0, 0, 0, 2,-2, 2,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 3, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-2,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2,-2, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 3, 0, 0, 0, 0, 0, 0,-2,-1, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2,-2, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 0, 3, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-3, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-1, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 9,-9,-9, 9, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 6, 3,-6,-3, 0, 0, 0, 0, 6,-6, 3,-3, 0, 0, 0, 0, 4, 2, 2, 1, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-6, 6, 6,-6, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-3,-3, 3, 3, 0, 0, 0, 0,-4, 4,-2, 2, 0, 0, 0, 0,-2,-2,-1,-1, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0,-2, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 2, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-6, 6, 6,-6, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-4,-2, 4, 2, 0, 0, 0, 0,-3, 3,-3, 3, 0, 0, 0, 0,-2,-1,-2,-1, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4,-4,-4, 4, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 2, 2,-2,-2, 0, 0, 0, 0, 2,-2, 2,-2, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0], # noqa: E501
-    [-3, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0, 0, 0,-1, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0,-3, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-2, 0, 0, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 9,-9, 0, 0,-9, 9, 0, 0, 6, 3, 0, 0,-6,-3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 6,-6, 0, 0, 3,-3, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 4, 2, 0, 0, 2, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [-6, 6, 0, 0, 6,-6, 0, 0,-3,-3, 0, 0, 3, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-4, 4, 0, 0,-2, 2, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-2,-2, 0, 0,-1,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0, 0, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -3, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0, 0, 0,-1, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 9,-9, 0, 0,-9, 9, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     6, 3, 0, 0,-6,-3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 6,-6, 0, 0, 3,-3, 0, 0, 4, 2, 0, 0, 2, 1, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-6, 6, 0, 0, 6,-6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -3,-3, 0, 0, 3, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-4, 4, 0, 0,-2, 2, 0, 0,-2,-2, 0, 0,-1,-1, 0, 0], # noqa: E501
-    [ 9, 0,-9, 0,-9, 0, 9, 0, 0, 0, 0, 0, 0, 0, 0, 0, 6, 0, 3, 0,-6, 0,-3, 0, 6, 0,-6, 0, 3, 0,-3, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4, 0, 2, 0, 2, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 9, 0,-9, 0,-9, 0, 9, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     6, 0, 3, 0,-6, 0,-3, 0, 6, 0,-6, 0, 3, 0,-3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4, 0, 2, 0, 2, 0, 1, 0], # noqa: E501
-    [-27,27,27,-27,27,-27,-27,27,-18,-9,18, 9,18, 9,-18,-9,-18,18,-9, 9,18,-18, 9,-9,-18,18,18,-18,-9, 9, 9, # noqa: E501
-     -9,-12,-6,-6,-3,12, 6, 6, 3,-12,-6,12, 6,-6,-3, 6, 3,-12,12,-6, 6,-6, 6,-3, 3,-8,-4,-4,-2,-4,-2,-2,-1], # noqa: E501
-    [18,-18,-18,18,-18,18,18,-18, 9, 9,-9,-9,-9,-9, 9, 9,12,-12, 6,-6,-12,12,-6, 6,12,-12,-12,12, 6,-6,-6, # noqa: E501
-     6, 6, 6, 3, 3,-6,-6,-3,-3, 6, 6,-6,-6, 3, 3,-3,-3, 8,-8, 4,-4, 4,-4, 2,-2, 4, 4, 2, 2, 2, 2, 1, 1], # noqa: E501
-    [-6, 0, 6, 0, 6, 0,-6, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 0,-3, 0, 3, 0, 3, 0,-4, 0, 4, 0,-2, 0, 2, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-2, 0,-1, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0,-6, 0, 6, 0, 6, 0,-6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -3, 0,-3, 0, 3, 0, 3, 0,-4, 0, 4, 0,-2, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-2, 0,-1, 0,-1, 0], # noqa: E501
-    [18,-18,-18,18,-18,18,18,-18,12, 6,-12,-6,-12,-6,12, 6, 9,-9, 9,-9,-9, 9,-9, 9,12,-12,-12,12, 6,-6,-6, # noqa: E501
-     6, 6, 3, 6, 3,-6,-3,-6,-3, 8, 4,-8,-4, 4, 2,-4,-2, 6,-6, 6,-6, 3,-3, 3,-3, 4, 2, 4, 2, 2, 1, 2, 1], # noqa: E501
-    [-12,12,12,-12,12,-12,-12,12,-6,-6, 6, 6, 6, 6,-6,-6,-6, 6,-6, 6, 6,-6, 6,-6,-8, 8, 8,-8,-4, 4, 4,-4, # noqa: E501
-     -3,-3,-3,-3, 3, 3, 3, 3,-4,-4, 4, 4,-2,-2, 2, 2,-4, 4,-4, 4,-2, 2,-2, 2,-2,-2,-2,-2,-1,-1,-1,-1], # noqa: E501
-    [ 2, 0, 0, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [-6, 6, 0, 0, 6,-6, 0, 0,-4,-2, 0, 0, 4, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 3, 0, 0,-3, 3, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0,-2,-1, 0, 0,-2,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 4,-4, 0, 0,-4, 4, 0, 0, 2, 2, 0, 0,-2,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2,-2, 0, 0, 2,-2, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     2, 0, 0, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-6, 6, 0, 0, 6,-6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -4,-2, 0, 0, 4, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-3, 3, 0, 0,-3, 3, 0, 0,-2,-1, 0, 0,-2,-1, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4,-4, 0, 0,-4, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     2, 2, 0, 0,-2,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2,-2, 0, 0, 2,-2, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0], # noqa: E501
-    [-6, 0, 6, 0, 6, 0,-6, 0, 0, 0, 0, 0, 0, 0, 0, 0,-4, 0,-2, 0, 4, 0, 2, 0,-3, 0, 3, 0,-3, 0, 3, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-1, 0,-2, 0,-1, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0,-6, 0, 6, 0, 6, 0,-6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     -4, 0,-2, 0, 4, 0, 2, 0,-3, 0, 3, 0,-3, 0, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0,-2, 0,-1, 0,-2, 0,-1, 0], # noqa: E501
-    [18,-18,-18,18,-18,18,18,-18,12, 6,-12,-6,-12,-6,12, 6,12,-12, 6,-6,-12,12,-6, 6, 9,-9,-9, 9, 9,-9,-9, # noqa: E501
-     9, 8, 4, 4, 2,-8,-4,-4,-2, 6, 3,-6,-3, 6, 3,-6,-3, 6,-6, 3,-3, 6,-6, 3,-3, 4, 2, 2, 1, 4, 2, 2, 1], # noqa: E501
-    [-12,12,12,-12,12,-12,-12,12,-6,-6, 6, 6, 6, 6,-6,-6,-8, 8,-4, 4, 8,-8, 4,-4,-6, 6, 6,-6,-6, 6, 6,-6, # noqa: E501
-     -4,-4,-2,-2, 4, 4, 2, 2,-3,-3, 3, 3,-3,-3, 3, 3,-4, 4,-2, 2,-4, 4,-2, 2,-2,-2,-1,-1,-2,-2,-1,-1], # noqa: E501
-    [ 4, 0,-4, 0,-4, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 2, 0,-2, 0,-2, 0, 2, 0,-2, 0, 2, 0,-2, 0, # noqa: E501
-     0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0], # noqa: E501
-    [ 0, 0, 0, 0, 0, 0, 0, 0, 4, 0,-4, 0,-4, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, # noqa: E501
-     2, 0, 2, 0,-2, 0,-2, 0, 2, 0,-2, 0, 2, 0,-2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0], # noqa: E501
-    [-12,12,12,-12,12,-12,-12,12,-8,-4, 8, 4, 8, 4,-8,-4,-6, 6,-6, 6, 6,-6, 6,-6,-6, 6, 6,-6,-6, 6, 6,-6, # noqa: E501
-     -4,-2,-4,-2, 4, 2, 4, 2,-4,-2, 4, 2,-4,-2, 4, 2,-3, 3,-3, 3,-3, 3,-3, 3,-2,-1,-2,-1,-2,-1,-2,-1], # noqa: E501
-    [ 8,-8,-8, 8,-8, 8, 8,-8, 4, 4,-4,-4,-4,-4, 4, 4, 4,-4, 4,-4,-4, 4,-4, 4, 4,-4,-4, 4, 4,-4,-4, 4, # noqa: E501
-     2, 2, 2, 2,-2,-2,-2,-2, 2, 2,-2,-2, 2, 2,-2,-2, 2,-2, 2,-2, 2,-2, 2,-2, 1, 1, 1, 1, 1, 1, 1, 1] # noqa: E501
-])
+def _tridiagonal_solve(dl: jax.Array, d: jax.Array, du: jax.Array, b: jax.Array):
+    """Solve a tridiagonal linear system with the Thomas algorithm.
 
-A_BICUBIC = np.array([
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
-    [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
-    [-3, 3, 0, 0, -2, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
-    [2, -2, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
-    [0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0 ],
-    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0 ],
-    [0, 0, 0, 0, 0, 0, 0, 0, -3, 3, 0, 0, -2, -1, 0, 0 ],
-    [0, 0, 0, 0, 0, 0, 0, 0, 2, -2, 0, 0, 1, 1, 0, 0 ],
-    [-3, 0, 3, 0, 0, 0, 0, 0, -2, 0, -1, 0, 0, 0, 0, 0 ],
-    [0, 0, 0, 0, -3, 0, 3, 0, 0, 0, 0, 0, -2, 0, -1, 0 ],
-    [9, -9, -9, 9, 6, 3, -6, -3, 6, -6, 3, -3, 4, 2, 2, 1 ],
-    [-6, 6, 6, -6, -3, -3, 3, 3, -4, 4, -2, 2, -2, -2, -1, -1 ],
-    [2, 0, -2, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0 ],
-    [0, 0, 0, 0, 2, 0, -2, 0, 0, 0, 0, 0, 1, 0, 1, 0 ],
-    [-6, 6, 6, -6, -4, -2, 4, 2, -3, 3, -3, 3, -2, -1, -2, -1 ],
-    [4, -4, -4, 4, 2, 2, -2, -2, 2, -2, 2, -2, 1, 1, 1, 1]
-])
+    Parameters
+    ----------
+    dl, d, du : ndarray, shape(N,)
+        Lower, main, and upper diagonals of the system matrix. dl[0] and du[-1]
+        should be zero.
+    b : ndarray, shape(N,...)
+        Right hand side(s), all of which are solved at once.
 
+    Returns
+    -------
+    x : ndarray, shape(N,...)
+        Solution of the linear system.
+
+    Notes
+    -----
+    jax.lax.linalg.tridiagonal_solve is only differentiable with respect to b, so
+    this is written with lax.scan to allow differentiating with respect to the knots.
+
+    """
+
+    def forward(carry, row):
+        cp, bp = carry
+        dli, di, dui, bi = row
+        denom = di - dli * cp
+        cp = dui / denom
+        bp = (bi - dli * bp) / denom
+        return (cp, bp), (cp, bp)
+
+    def backward(xi, row):
+        cpi, bpi = row
+        xi = bpi - cpi * xi
+        return xi, xi
+
+    init = (jnp.zeros_like(d[0]), jnp.zeros_like(b[0]))
+    _, (cp, bp) = jax.lax.scan(forward, init, (dl, d, du, b))
+    _, x = jax.lax.scan(backward, jnp.zeros_like(bp[0]), (cp, bp), reverse=True)
+    return x
+
+
+# fmt: off
 A_CUBIC = np.array([
     [1, 0, 0, 0],
     [0, 0, 1, 0],
@@ -1,5 +1,7 @@
 """Tests for interpolation functions."""
 
+import logging
+
 import jax
 import jax.numpy as jnp
 import numpy as np
@@ -20,47 +22,122 @@ from interpax import (
 jax_config.update("jax_enable_x64", True)
 
 
+def _to_device(*arrays):
+    """Transfer arrays to the default device once, up front."""
+    return jax.block_until_ready(tuple(map(jnp.asarray, arrays)))
+
+
+def _make_interp(kind, interpolator):
+    """Functional or class based form of a cached Interpolator*D."""
+    if kind == "class":
+        return interpolator
+    fun, knots = {
+        Interpolator1D: (interp1d, "x"),
+        Interpolator2D: (interp2d, "xy"),
+        Interpolator3D: (interp3d, "xyz"),
+    }[type(interpolator)]
+    knots = [getattr(interpolator, k) for k in knots]
+    return lambda *xq: fun(
+        *xq,
+        *knots,
+        interpolator.f,
+        method=interpolator.method,
+        extrap=interpolator.extrap,
+        period=interpolator.period,
+    )
+
+
+@pytest.fixture(scope="module")
+def data1d():
+    """Knots and values of sin(x), shared by the 1d tests."""
+    xp = np.linspace(0, 2 * np.pi, 100)
+    return _to_device(xp, np.sin(xp))
+
+
+@pytest.fixture(scope="module")
+def data2d():
+    """Knots and values of sin(x)cos(y), shared by the 2d AD tests."""
+    xp = np.linspace(0, 4 * np.pi, 40)
+    yp = np.linspace(0, 2 * np.pi, 40)
+    return _to_device(xp, yp, np.sin(xp)[:, None] * np.cos(yp)[None])
+
+
+@pytest.fixture(scope="module")
+def data3d():
+    """Knots and values of sin(x)cos(y)z^2, shared by the 3d AD tests."""
+    xp = np.linspace(0, np.pi, 20)
+    yp = np.linspace(0, 2 * np.pi, 30)
+    zp = np.linspace(0, 1, 10)
+    fp = np.sin(xp)[:, None, None] * np.cos(yp)[None, :, None] * zp**2
+    return _to_device(xp, yp, zp, fp)
+
+
 class TestInterp1D:
     """Tests for interp1d function."""
 
+    # rtol, atol for each method
+    tols = {
+        "nearest": (1e-2, 1e-1),
+        "linear": (1e-4, 1e-3),
+        "cubic": (1e-6, 1e-5),
+        "cubic2": (1e-6, 1e-5),
+        "cardinal": (1e-6, 1e-5),
+        "catmull-rom": (1e-6, 1e-5),
+        "monotonic": (1e-4, 1e-3),
+        "monotonic-0": (1e-4, 1e-2),
+    }
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def interpolators1d(cls, data1d):
+        """Interpolator1D for each method, shared by all cases in the class."""
+        xp, fp = data1d
+        return {method: Interpolator1D(xp, fp, method=method) for method in cls.tols}
+
     @pytest.mark.unit
-    @pytest.mark.parametrize("x", [
-        np.linspace(0, 2 * np.pi, 10000),
-        0.0,
-    ])
-    def test_interp1d(self, x):
+    @pytest.mark.parametrize("kind", ["functional", "class"])
+    @pytest.mark.parametrize("method", list(tols))
+    def test_interp1d(self, method, kind, interpolators1d):
         """Test accuracy of different 1d interpolation methods."""
-        xp = np.linspace(0, 2 * np.pi, 100)
+        interp = _make_interp(kind, interpolators1d[method])
+        x = np.linspace(0, 2 * np.pi, 10000)
         f = lambda x: np.sin(x)
-        fp = f(xp)
-
-        interp1 = lambda xq, *args, **kwargs: interp1d(xq, *args, **kwargs)
-        interp2 = lambda xq, *args, **kwargs: Interpolator1D(*args, **kwargs)(xq)
-
-        for interp in [interp1, interp2]:
-            fq = interp(x, xp, fp, method="nearest")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-2, atol=1e-1)
-
-            fq = interp(x, xp, fp, method="linear")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-4, atol=1e-3)
+        rtol, atol = self.tols[method]
 
-            fq = interp(x, xp, fp, method="cubic")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-6, atol=1e-5)
+        fq = interp(x)
+        np.testing.assert_allclose(fq, f(x), rtol=rtol, atol=atol)
 
-            fq = interp(x, xp, fp, method="cubic2")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-6, atol=1e-5)
-
-            fq = interp(x, xp, fp, method="cardinal")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-6, atol=1e-5)
-
-            fq = interp(x, xp, fp, method="catmull-rom")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-6, atol=1e-5)
-
-            fq = interp(x, xp, fp, method="monotonic")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-4, atol=1e-3)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("method", list(tols))
+    def test_interp1d_scalar(self, method, interpolators1d):
+        """Test 1d interpolation at a single query point."""
+        interpolator = interpolators1d[method]
+        xp, fp = interpolator.x, interpolator.f
+        rtol, atol = self.tols[method]
+
+        fq = interp1d(jnp.atleast_1d(0.0), xp, fp, method=method)
+        assert fq.shape == (1,)
+        np.testing.assert_allclose(fq[0], 0.0, rtol=rtol, atol=atol)
+
+        # scalar queries should give scalar results
+        fq = interpolator(0.0)
+        assert fq.shape == ()
+        np.testing.assert_allclose(fq, 0.0, rtol=rtol, atol=atol)
 
-            fq = interp(x, xp, fp, method="monotonic-0")
-            np.testing.assert_allclose(fq, f(x), rtol=1e-4, atol=1e-2)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("dtype", [jnp.float32, jnp.float64])
+    @pytest.mark.parametrize("method", list(tols))
+    def test_interp1d_dtype(self, method, dtype, data1d):
+        """Test storing 1d interpolation data at a given precision."""
+        xp, fp = data1d
+        x = np.linspace(0, 2 * np.pi, 1000)
+        rtol, atol = self.tols[method]
+
+        interpolator = Interpolator1D(xp, fp, method=method, dtype=dtype)
+        assert interpolator.f.dtype == dtype
+        for fx in interpolator.derivs.values():
+            assert fx.dtype == dtype
+        np.testing.assert_allclose(interpolator(x), np.sin(x), rtol=rtol, atol=atol)
 
     @pytest.mark.unit
     def test_interp1d_extrap_periodic(self):
@@ -81,16 +158,68 @@ class TestInterp1D:
         fq = interp1d(x, xp, fp, method="cubic", period=2 * np.pi)
         np.testing.assert_allclose(fq, f(x), rtol=1e-6, atol=1e-2)
 
+    @pytest.mark.unit
+    def test_interp1d_uniform(self, data1d):
+        """Test that locating points on a uniform grid matches binary search."""
+        xp, fp = data1d
+        x = np.linspace(-1, 2 * np.pi + 1, 10000)
+
+        assert Interpolator1D(xp, fp).uniform
+        assert not Interpolator1D(xp**2, fp).uniform
+        # endpoint duplicates the first knot once wrapped
+        assert not Interpolator1D(xp, fp, period=2 * np.pi).uniform
+        assert Interpolator1D(xp[:-1], fp[:-1], period=2 * np.pi).uniform
+        with pytest.raises(ValueError):
+            Interpolator1D(xp, fp, uniform="no")
+
+        # integer knots
+        xi = np.arange(10)
+        assert Interpolator1D(xi, np.sin(xi)).uniform
+        for method in ["linear", "cubic"]:
+            fq1 = interp1d(x, xi, np.sin(xi), method, extrap=True)
+            fq2 = Interpolator1D(xi, np.sin(xi), method, extrap=True)(x)
+            np.testing.assert_allclose(fq1, fq2, rtol=1e-12, atol=1e-12)
+
+        for method in ["nearest", "linear", "cubic", "cubic2", "monotonic"]:
+            fq1 = interp1d(x, xp, fp, method, extrap=True, uniform=False)
+            fq2 = interp1d(x, xp, fp, method, extrap=True, uniform=True)
+            np.testing.assert_allclose(fq1, fq2, rtol=1e-12, atol=1e-12)
+
+    @pytest.mark.unit
+    def test_interp1d_no_recompile(self, caplog, data1d):
+        """Test that repeated interpolator calls reuse the compiled function."""
+        xp, fp = data1d
+        x = np.linspace(0, 2 * np.pi, 1000)
+
+        interp1d(x, xp, fp, method="cubic2")
+        Interpolator1D(xp, fp, method="cubic2")(x)
+        jax.grad(lambda xq: interp1d(xq, xp, fp, method="cubic2"))(1.0)
+
+        fp = jax.block_until_ready(2 * fp)
+        with jax.log_compiles(), caplog.at_level(logging.WARNING):
+            interp1d(x + 1, xp, fp, method="cubic2")
+            Interpolator1D(xp, fp, method="cubic2")(x + 1)
+            # derivative order is traced, so it shouldn't need a new compile either
+            Interpolator1D(xp, fp, method="cubic2")(x + 1, dx=1)
+            jax.grad(lambda xq: interp1d(xq, xp, fp, method="cubic2"))(2.0)
+        assert not [r for r in caplog.records if "Compiling" in r.getMessage()]
+
     @pytest.mark.unit
     def test_interp1d_monotonic(self):
         """Ensure monotonic interpolation is actually monotonic."""
         # true function is just linear with a jump discontinuity at x=1.5
-        x = np.linspace(-4, 5, 10)
-        f = np.heaviside(x - 1.5, 0) + 0.1 * x
-        xq = np.linspace(-4, 5, 1000)
-        dfc = interp1d(xq, x, f, derivative=1, method="cubic")
-        dfm = interp1d(xq, x, f, derivative=1, method="monotonic")
-        dfm0 = interp1d(xq, x, f, derivative=1, method="monotonic-0")
+        x = jnp.linspace(-4, 5, 10)
+        f = jnp.heaviside(x - 1.5, 0.0) + 0.1 * x
+        xq = jnp.linspace(-4, 5, 1000)
+
+        @jax.jit
+        def slopes(xq, x, f):
+            return [
+                interp1d(xq, x, f, derivative=1, method=method)
+                for method in ["cubic", "monotonic", "monotonic-0"]
+            ]
+
+        dfc, dfm, dfm0 = slopes(xq, x, f)
         assert dfc.min() < 0  # cubic interpolation undershoots, giving negative slope
         assert dfm.min() > 0  # monotonic interpolation doesn't
         assert dfm0.min() >= 0  # monotonic-0 doesn't overshoot either
@@ -101,104 +230,143 @@ class TestInterp1D:
 class TestInterp2D:
     """Tests for interp2d function."""
 
-    @pytest.mark.unit
-    @pytest.mark.parametrize("x, y", [
-        (np.linspace(0, 3 * np.pi, 1000), np.linspace(0, 2 * np.pi, 1000)),
-        (0.0, 0.0),
-    ])
-    def test_interp2d(self, x, y):
-        """Test accuracy of different 2d interpolation methods."""
+    # rtol, atol for each method
+    tols = {
+        "nearest": (1e-2, 1),
+        "linear": (1e-4, 1e-2),
+        "cubic": (1e-5, 2e-3),
+        "cubic2": (1e-5, 2e-3),
+        "catmull-rom": (1e-5, 2e-3),
+        "cardinal": (1e-5, 2e-3),
+    }
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def interpolators2d(cls):
+        """Interpolator2D for each method, shared by all cases in the class."""
         xp = np.linspace(0, 3 * np.pi, 99)
         yp = np.linspace(0, 2 * np.pi, 40)
-        xxp, yyp = np.meshgrid(xp, yp, indexing="ij")
-
-        f = lambda x, y: np.sin(x) * np.cos(y)
-        fp = f(xxp, yyp)
-
-        interp1 = lambda xq, yq, *args, **kwargs: interp2d(xq, yq, *args, **kwargs)
-        interp2 = lambda xq, yq, *args, **kwargs: Interpolator2D(*args, **kwargs)(
-            xq, yq
-        )
-
-        for interp in [interp1, interp2]:
-            fq = interp(
-                x, y, xp, yp, fp, method="nearest", period=(2 * np.pi, 2 * np.pi)
+        fp = np.sin(xp)[:, None] * np.cos(yp)[None]
+        return {
+            method: Interpolator2D(
+                xp, yp, fp, method=method, period=(2 * np.pi, 2 * np.pi)
             )
-            np.testing.assert_allclose(fq, f(x, y), rtol=1e-2, atol=1)
+            for method in cls.tols
+        }
 
-            fq = interp(
-                x, y, xp, yp, fp, method="linear", period=(2 * np.pi, 2 * np.pi)
-            )
-            np.testing.assert_allclose(fq, f(x, y), rtol=1e-4, atol=1e-2)
-            atol = 2e-3
-            rtol = 1e-5
-            fq = interp(x, y, xp, yp, fp, method="cubic", period=(2 * np.pi, 2 * np.pi))
-            np.testing.assert_allclose(fq, f(x, y), rtol=rtol, atol=atol)
-
-            fq = interp(
-                x, y, xp, yp, fp, method="cubic2", period=(2 * np.pi, 2 * np.pi)
-            )
-            np.testing.assert_allclose(fq, f(x, y), rtol=rtol, atol=atol)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("kind", ["functional", "class"])
+    @pytest.mark.parametrize("method", list(tols))
+    @pytest.mark.parametrize(
+        "x, y",
+        [
+            (np.linspace(0, 3 * np.pi, 1000), np.linspace(0, 2 * np.pi, 1000)),
+            (0.0, 0.0),
+        ],
+    )
+    def test_interp2d(self, x, y, method, kind, interpolators2d):
+        """Test accuracy of different 2d interpolation methods."""
+        interp = _make_interp(kind, interpolators2d[method])
+        f = lambda x, y: np.sin(x) * np.cos(y)
+        rtol, atol = self.tols[method]
 
-            fq = interp(
-                x, y, xp, yp, fp, method="catmull-rom", period=(2 * np.pi, 2 * np.pi)
-            )
-            np.testing.assert_allclose(fq, f(x, y), rtol=rtol, atol=atol)
+        fq = interp(x, y)
+        np.testing.assert_allclose(fq, f(x, y), rtol=rtol, atol=atol)
 
-            fq = interp(
-                x, y, xp, yp, fp, method="cardinal", period=(2 * np.pi, 2 * np.pi)
-            )
-            np.testing.assert_allclose(fq, f(x, y), rtol=rtol, atol=atol)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("dtype", [jnp.float32, jnp.float64])
+    @pytest.mark.parametrize("method", list(tols))
+    def test_interp2d_dtype(self, method, dtype, interpolators2d):
+        """Test storing 2d interpolation data at a given precision."""
+        x = np.linspace(0, 3 * np.pi, 1000)
+        y = np.linspace(0, 2 * np.pi, 1000)
+        f = np.sin(x) * np.cos(y)
+        rtol, atol = self.tols[method]
+
+        interp = interpolators2d[method]
+        interpolator = Interpolator2D(
+            interp.x,
+            interp.y,
+            interp.f,
+            method=method,
+            period=interp.period,
+            dtype=dtype,
+        )
+        assert interpolator.f.dtype == dtype
+        for fx in interpolator.derivs.values():
+            assert fx.dtype == dtype
+        fq = interpolator(x, y)
+        np.testing.assert_allclose(fq, f, rtol=rtol, atol=atol)
 
 
 class TestInterp3D:
     """Tests for interp3d function."""
 
-    @pytest.mark.unit
-    @pytest.mark.parametrize("x, y, z", [
-        (np.linspace(0, np.pi, 1000), np.linspace(0, 2 * np.pi, 1000), np.linspace(0, 3, 1000)),
-        (0.0, 0.0, 0.0),
-    ])
-    def test_interp3d(self, x, y, z):
-        """Test accuracy of different 3d interpolation methods."""
+    # rtol, atol for each method
+    tols = {
+        "nearest": (1e-2, 1),
+        "linear": (1e-3, 1e-1),
+        "cubic": (1e-5, 5.5e-3),
+        "cubic2": (1e-5, 5.5e-3),
+        "catmull-rom": (1e-5, 5.5e-3),
+        "cardinal": (1e-5, 5.5e-3),
+    }
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def interpolators3d(cls):
+        """Interpolator3D for each method, shared by all cases in the class."""
         xp = np.linspace(0, np.pi, 20)
         yp = np.linspace(0, 2 * np.pi, 30)
         zp = np.linspace(0, 3, 25)
-        xxp, yyp, zzp = np.meshgrid(xp, yp, zp, indexing="ij")
+        fp = np.sin(xp)[:, None, None] * np.cos(yp)[None, :, None] * zp**2
+        return {
+            method: Interpolator3D(xp, yp, zp, fp, method=method) for method in cls.tols
+        }
 
+    @pytest.mark.unit
+    @pytest.mark.parametrize("kind", ["functional", "class"])
+    @pytest.mark.parametrize("method", list(tols))
+    @pytest.mark.parametrize(
+        "x, y, z",
+        [
+            (
+                np.linspace(0, np.pi, 1000),
+                np.linspace(0, 2 * np.pi, 1000),
+                np.linspace(0, 3, 1000),
+            ),
+            (0.0, 0.0, 0.0),
+        ],
+    )
+    def test_interp3d(self, x, y, z, method, kind, interpolators3d):
+        """Test accuracy of different 3d interpolation methods."""
+        interp = _make_interp(kind, interpolators3d[method])
         f = lambda x, y, z: np.sin(x) * np.cos(y) * z**2
-        fp = f(xxp, yyp, zzp)
-
-        interp1 = lambda xq, yq, zq, *args, **kwargs: interp3d(
-            xq, yq, zq, *args, **kwargs
-        )
-        interp2 = lambda xq, yq, zq, *args, **kwargs: Interpolator3D(*args, **kwargs)(
-            xq, yq, zq
-        )
-
-        for interp in [interp1, interp2]:
-            fq = interp(x, y, z, xp, yp, zp, fp)
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=1e-5, atol=1e-2)
-
-            fq = interp(x, y, z, xp, yp, zp, fp, method="nearest")
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=1e-2, atol=1)
+        rtol, atol = self.tols[method]
 
-            fq = interp(x, y, z, xp, yp, zp, fp, method="linear")
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=1e-3, atol=1e-1)
+        fq = interp(x, y, z)
+        np.testing.assert_allclose(fq, f(x, y, z), rtol=rtol, atol=atol)
 
-            atol = 5.5e-3
-            rtol = 1e-5
-            fq = interp(x, y, z, xp, yp, zp, fp, method="cubic")
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=rtol, atol=atol)
-
-            fq = interp(x, y, z, xp, yp, zp, fp, method="cubic2")
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=rtol, atol=atol)
-
-            fq = interp(x, y, z, xp, yp, zp, fp, method="catmull-rom")
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=rtol, atol=atol)
-
-            fq = interp(x, y, z, xp, yp, zp, fp, method="cardinal")
-            np.testing.assert_allclose(fq, f(x, y, z), rtol=rtol, atol=atol)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("dtype", [jnp.float32, jnp.float64])
+    @pytest.mark.parametrize("method", list(tols))
+    def test_interp3d_dtype(self, method, dtype, interpolators3d):
+        """Test storing 3d interpolation data at a given precision."""
+        x = np.linspace(0, np.pi, 1000)
+        y = np.linspace(0, 2 * np.pi, 1000)
+        z = np.linspace(0, 3, 1000)
+        f = np.sin(x) * np.cos(y) * z**2
+        rtol, atol = self.tols[method]
+
+        interp = interpolators3d[method]
+        interpolator = Interpolator3D(
+            interp.x, interp.y, interp.z, interp.f, method=method, dtype=dtype
+        )
+        assert interpolator.f.dtype == dtype
+        for fx in interpolator.derivs.values():
+            assert fx.dtype == dtype
+        fq = interpolator(x, y, z)
+        np.testing.assert_allclose(fq, f, rtol=rtol, atol=atol)
 
 
 @pytest.mark.unit
@@ -225,6 +393,12 @@ def test_fft_interp1d():
         np.testing.assert_allclose(
             fs, fft_interp1d(fi, *fi.shape, sx=0.2, dx=np.diff(x[sp][1])[0]).squeeze()
         )
+        # several shifts are evaluated in one call, batched along the last axis
+        shifts = np.array([0.2, -0.7, 1.5])
+        fs = np.stack([fun(x[sp][1] + a) for a in shifts], axis=-1)
+        np.testing.assert_allclose(
+            fs, fft_interp1d(fi, *fi.shape, sx=shifts, dx=np.diff(x[sp][1])[0])
+        )
         for ep in ["o", "e"]:  # eval parity
             for s in ["up", "down"]:  # up or downsample
                 if s == "up":
@@ -275,17 +449,23 @@ def test_fft_interp2d():
     for spx in ["o", "e"]:  # source parity x
         for spy in ["o", "e"]:  # source parity y
             fi = f2[spx][spy][1][1]
-            fs = fun2(x[spx][1] + 0.2, y[spy][1] + 0.3)
+            # several shifts are evaluated in one call, batched along the last axis
+            shiftx = np.array([0.2, -0.7, 1.5])
+            shifty = np.array([0.3, 1.1, -0.4])
+            fs = np.stack(
+                [fun2(x[spx][1] + a, y[spy][1] + b) for a, b in zip(shiftx, shifty)],
+                axis=-1,
+            )
             np.testing.assert_allclose(
                 fs,
                 fft_interp2d(
                     fi,
                     *fi.shape,
-                    sx=0.2,
-                    sy=0.3,
+                    sx=shiftx,
+                    sy=shifty,
                     dx=np.diff(x[spx][1])[0],
-                    dy=np.diff(y[spy][1])[0]
-                ).squeeze(),
+                    dy=np.diff(y[spy][1])[0],
+                ),
             )
             for epx in ["o", "e"]:  # eval parity x
                 for epy in ["o", "e"]:  # eval parity y
@@ -312,48 +492,56 @@ def test_fft_interp2d():
                             )
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize("nx, n1", [(33, 133), (32, 132), (33, 20), (32, 21)])
+@pytest.mark.parametrize("ny, n2", [(33, 132), (32, 133), (33, 21), (32, 20)])
+def test_fft_interp2d_separable(nx, n1, ny, n2):
+    """Test 2d Fourier interpolation of a product matches 1d along each axis."""
+    # random data is not band limited, so the nyquist frequencies matter here
+    rng = np.random.default_rng(0)
+    g = rng.standard_normal(nx)
+    h = rng.standard_normal(ny)
+    sx = np.array([0.0, 0.2, -0.7, 1.5])
+    sy = np.array([0.0, 0.3, 1.1, -0.4])
+    fi = fft_interp2d(np.outer(g, h), n1, n2, sx=sx, sy=sy)
+    gi = fft_interp1d(g, n1, sx=sx)
+    hi = fft_interp1d(h, n2, sx=sy)
+    np.testing.assert_allclose(fi, gi[:, None] * hi[None], rtol=1e-12, atol=1e-12)
+
+
 class TestAD:
     """Tests to make sure JAX transforms work correctly."""
 
     def _finite_difference(self, f, x, eps=1e-8):
         """Util for 2nd order centered finite differences."""
         x0 = np.atleast_1d(x).squeeze()
-        f0 = f(x0)
-        m = f0.size
+        m = f(x0).size
         n = x0.size
-        J = np.zeros((m, n))
         h = np.maximum(1.0, np.abs(x0)) * eps
         h_vecs = np.diag(np.atleast_1d(h))
-        for i in range(n):
-            x1 = x0 - h_vecs[i]
-            x2 = x0 + h_vecs[i]
-            if x0.ndim:
-                dx = x2[i] - x1[i]
-            else:
-                dx = x2 - x1
-            f1 = f(x1)
-            f2 = f(x2)
-            df = f2 - f1
-            dfdx = df / dx
-            J[:, i] = dfdx.flatten()
+        x1 = (x0 - h_vecs).reshape((n,) + x0.shape)
+        x2 = (x0 + h_vecs).reshape((n,) + x0.shape)
+        dx = np.diagonal((x2 - x1).reshape((n, n)))
+        # evaluate all 2n perturbed points in a single batched call
+        f12 = jax.vmap(f)(jnp.concatenate([x1, x2]))
+        df = (f12[n:] - f12[:n]).reshape((n, m))
+        J = np.asarray(df / dx[:, None]).T
         if m == 1:
             J = np.ravel(J)
         return J
 
     @pytest.mark.unit
-    def test_ad_interp1d(self):
+    def test_ad_interp1d(self, data1d):
         """Test AD of different 1d interpolation methods."""
-        xp = np.linspace(0, 2 * np.pi, 100)
+        xp, fp = data1d
         x = np.linspace(0, 2 * np.pi, 200)
-        f = lambda x: np.sin(x)
-        fp = f(xp)
 
         for method in ["cubic", "cubic2", "cardinal"]:
             interp1 = lambda xq: interp1d(xq, xp, fp, method=method)
             interp2 = lambda xq: Interpolator1D(xp, fp, method=method)(xq)
 
-            f1 = jnp.vectorize(jax.grad(interp1))(x)
-            f2 = jnp.vectorize(jax.grad(interp2))(x)
+            f1 = jax.vmap(jax.grad(interp1))(x)
+            f2 = jax.vmap(jax.grad(interp2))(x)
 
             np.testing.assert_allclose(f1, np.cos(x), rtol=1e-2, atol=1e-2)
             np.testing.assert_allclose(f1, f2)
@@ -400,23 +588,18 @@ class TestAD:
             np.testing.assert_allclose(jacf2[1:-1], jacd2[1:-1], rtol=1e-6, atol=1e-6)
 
     @pytest.mark.unit
-    def test_ad_interp2d(self):
+    def test_ad_interp2d(self, data2d):
         """Test AD of different 2d interpolation methods."""
-        xp = np.linspace(0, 4 * np.pi, 40)
-        yp = np.linspace(0, 2 * np.pi, 40)
+        xp, yp, fp = data2d
         y = np.linspace(0, 2 * np.pi, 100)
         x = np.linspace(0, 2 * np.pi, 100)
-        xxp, yyp = np.meshgrid(xp, yp, indexing="ij")
-
-        f = lambda x, y: np.sin(x) * np.cos(y)
-        fp = f(xxp, yyp)
 
         for method in ["cubic", "cubic2", "cardinal"]:
             interp1 = lambda xq, yq: interp2d(xq, yq, xp, yp, fp, method=method)
             interp2 = lambda xq, yq: Interpolator2D(xp, yp, fp, method=method)(xq, yq)
 
-            f1 = jnp.vectorize(jax.grad(interp1))(x, y)
-            f2 = jnp.vectorize(jax.grad(interp2))(x, y)
+            f1 = jax.vmap(jax.grad(interp1))(x, y)
+            f2 = jax.vmap(jax.grad(interp2))(x, y)
 
             np.testing.assert_allclose(f1, np.cos(x) * np.cos(y), rtol=3e-2, atol=3e-2)
             np.testing.assert_allclose(f1, f2)
@@ -458,18 +641,12 @@ class TestAD:
             np.testing.assert_allclose(jacf2[1:-1], jacd2[1:-1], rtol=1e-6, atol=1e-6)
 
     @pytest.mark.unit
-    def test_ad_interp3d(self):
+    def test_ad_interp3d(self, data3d):
         """Test AD of different 3d interpolation methods."""
-        xp = np.linspace(0, np.pi, 20)
-        yp = np.linspace(0, 2 * np.pi, 30)
-        zp = np.linspace(0, 1, 10)
+        xp, yp, zp, fp = data3d
         x = np.linspace(0, np.pi, 100)
         y = np.linspace(0, 2 * np.pi, 100)
         z = np.linspace(0, 1, 100)
-        xxp, yyp, zzp = np.meshgrid(xp, yp, zp, indexing="ij")
-
-        f = lambda x, y, z: np.sin(x) * np.cos(y) * z**2
-        fp = f(xxp, yyp, zzp)
 
         for method in ["cubic", "cubic2", "cardinal"]:
             interp1 = lambda xq, yq, zq: interp3d(
@@ -479,8 +656,8 @@ class TestAD:
                 xq, yq, zq
             )
 
-            f1 = jnp.vectorize(jax.grad(interp1))(x, y, z)
-            f2 = jnp.vectorize(jax.grad(interp2))(x, y, z)
+            f1 = jax.vmap(jax.grad(interp1))(x, y, z)
+            f2 = jax.vmap(jax.grad(interp2))(x, y, z)
 
             np.testing.assert_allclose(
                 f1, np.cos(x) * np.cos(y) * z**2, rtol=3e-2, atol=3e-2